@@ -1,12 +1,111 @@
+import os
 import random
 import time
-import copy
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# A win scores 1 - 0.01 per ply from the root to it (a loss the negative), so faster wins and
+# slower losses are preferred. Heuristic values stay within +/-0.75, so any score beyond
+# DECIDED_SCORE means the game outcome is decided.
+PLY_PENALTY = 0.01
+DECIDED_SCORE = 0.8
+
+# Bitboards: cell (row, col) is bit row*5 + col of a 25-bit integer
+FULL_BOARD = (1 << 25) - 1
+
+# ADJ_MASKS[square] is the bitboard of the cells adjacent (horizontally, vertically or
+# diagonally) to that square, which are the destinations of a move-phase move
+ADJ_MASKS = [sum(1 << ((r + dr) * 5 + c + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                 if (dr or dc) and 0 <= r + dr < 5 and 0 <= c + dc < 5)
+             for r in range(5) for c in range(5)]
+
+# Every line of 4 cells: horizontal, vertical, diagonal (top-left to bottom-right) and
+# diagonal (top-right to bottom-left), as (row, col) tuples
+LINES = [tuple((i + k*dr, j + k*dc) for k in range(4))
+         for i in range(5) for j in range(5)
+         for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1))
+         if 0 <= i + 3*dr < 5 and 0 <= j + 3*dc < 5]
+# Every 2x2 box of cells
+BOXES = [((i, j), (i+1, j), (i, j+1), (i+1, j+1)) for i in range(4) for j in range(4)]
+
+# The winning formations above as bitboard masks, computed once at import time.
+# Boxes come first since they are the cheapest to form and so the most common wins.
+WIN_MASKS = [sum(1 << (r * 5 + c) for r, c in cells) for cells in BOXES + LINES]
+
+# The 8 symmetries of the board (4 rotations, each optionally mirrored) as permutations
+# mapping square = row*5 + col to its image, along with their inverses
+_ROTATIONS = (lambda r, c: (r, c), lambda r, c: (c, 4 - r), lambda r, c: (4 - r, 4 - c), lambda r, c: (4 - c, r))
+SYMMETRIES = [tuple(r * 5 + (4 - c if mirror else c) for r, c in (rotate(*divmod(sq, 5)) for sq in range(25)))
+              for rotate in _ROTATIONS for mirror in (False, True)]
+INVERSE_SYMMETRIES = [tuple(perm.index(sq) for sq in range(25)) for perm in SYMMETRIES]
+
+class _SearchTimeout(Exception):
+    """ Raised inside the search when the time budget for a move runs out. """
+
+def _decode_move(move, drop_phase):
+    """ Converts a move encoded as an int by the search into the list of move tuples used by
+    make_move. Drops are encoded as to_square and moves as to_square*25 + from_square, where
+    square = row*5 + col.
+    """
+    if drop_phase:
+        return [divmod(move, 5)]
+    to_sq, from_sq = divmod(move, 25)
+    return [divmod(to_sq, 5), divmod(from_sq, 5)]
+
+@lru_cache(maxsize=200_000)
+def _heuristic(my_bits, opp_bits):
+    """ Bitboard version of TeekoPlayer.heuristic_game_value, memoized since different move orders
+    reach the same leaves. A formation only counts for a player while the other player has no
+    piece in it.
+    """
+    my_val = 0
+    opp_val = 0
+    for m in WIN_MASKS:
+        mine = my_bits & m
+        theirs = opp_bits & m
+        if not theirs:
+            if mine and mine.bit_count() > my_val:
+                my_val = mine.bit_count()
+        elif not mine and theirs.bit_count() > opp_val:
+            opp_val = theirs.bit_count()
+    return (my_val - opp_val) / 4 # Normalize to be between -1 and 1
+
+def _score_to_tt(score, depth):
+    """ Converts a win/loss score found at depth into one relative to that node, so that the
+    transposition table entry stays valid when the position is reached at another depth.
+    """
+    if score > DECIDED_SCORE:
+        return score + depth * PLY_PENALTY
+    if score < -DECIDED_SCORE:
+        return score - depth * PLY_PENALTY
+    return score
+
+def _score_from_tt(score, depth):
+    """ Inverse of _score_to_tt for a transposition table entry used at depth. """
+    if score > DECIDED_SCORE:
+        return score - depth * PLY_PENALTY
+    if score < -DECIDED_SCORE:
+        return score + depth * PLY_PENALTY
+    return score
+
+def _map_move(move, perm, drop_phase):
+    """ Applies a board symmetry permutation to a move encoded as an int. """
+    if move is None:
+        return None
+    if drop_phase:
+        return perm[move]
+    to_sq, from_sq = divmod(move, 25)
+    return perm[to_sq] * 25 + perm[from_sq]
 
 class TeekoPlayer:
     """ An object representation for an AI game player for the game Teeko.
     """
     board = [[' ' for j in range(5)] for i in range(5)]
     pieces = ['X', 'O']
+    TT_SIZE = 1 << 18 # Number of transposition table slots, must be a power of two
 
     def __init__(self):
         """ Initializes a TeekoPlayer object by randomly selecting red or black as its
@@ -14,7 +113,21 @@ class TeekoPlayer:
         """
         self.my_piece = random.choice(self.pieces)
         self.opp = self.pieces[0] if self.my_piece == self.pieces[1] else self.pieces[1]
-        self.AI_SEARCH_DEPTH = 3 # The depth for the minimax search
+        self.AI_SEARCH_DEPTH = 8 # The maximum depth for the iterative deepening search
+        self.AI_TIME_LIMIT = 2.0 # Seconds the iterative deepening search may spend on a move
+        self.deadline = float('inf') # Time at which the current search is abandoned
+        self.AI_PARALLEL_WORKERS = os.cpu_count() or 1 # Processes used to search root moves in parallel
+        self.AI_PARALLEL_MIN_DEPTH = 4 # Shallower iterations are too cheap to be worth parallelizing
+        self._executor = None # Created on first use
+        self.killer_moves = {} # depth -> last move that caused an alpha-beta cutoff at that depth
+
+        # Zobrist keys indexed by [square][piece-id] where ' '=0, my_piece=1, opp=2
+        self.zobrist = [[random.getrandbits(64) for _ in range(3)] for _ in range(25)]
+        self.zobrist_side = random.getrandbits(64) # Toggled on every ply so both sides to move hash differently
+        # Keys of each [square][piece-id] after applying each of the 8 symmetries, for canonical hashing
+        self.sym_zobrist = [[tuple(self.zobrist[perm[sq]][piece_id] for perm in SYMMETRIES) for piece_id in range(3)]
+                            for sq in range(25)]
+        self.tt = {} # slot -> (hash, remaining_depth, score, flag, best_move), replace-always
 
     def heuristic_game_value(self, state, piece):
         """
@@ -22,159 +135,363 @@ class TeekoPlayer:
         A higher positive value is better for the AI, a lower negative value is better for the opponent.
         The heuristic prioritizes having more pieces in a line or box formation.
         """
-        my_val = 0
-        opp_val = 0
-
-        # Check all possible winning lines for my piece and opponent's piece
-        for i in range(5):
-            for j in range(5):
-                # Horizontal
-                if j <= 1:
-                    my_val = max(my_val, self._count_line(state, i, j, 0, 1, self.my_piece))
-                    opp_val = max(opp_val, self._count_line(state, i, j, 0, 1, self.opp))
-                # Vertical
-                if i <= 1:
-                    my_val = max(my_val, self._count_line(state, i, j, 1, 0, self.my_piece))
-                    opp_val = max(opp_val, self._count_line(state, i, j, 1, 0, self.opp))
-                # Diagonal (top-left to bottom-right)
-                if i <= 1 and j <= 1:
-                    my_val = max(my_val, self._count_line(state, i, j, 1, 1, self.my_piece))
-                    opp_val = max(opp_val, self._count_line(state, i, j, 1, 1, self.opp))
-                # Diagonal (top-right to bottom-left)
-                if i <= 1 and j >= 3:
-                    my_val = max(my_val, self._count_line(state, i, j, 1, -1, self.my_piece))
-                    opp_val = max(opp_val, self._count_line(state, i, j, 1, -1, self.opp))
-                # 2x2 Box
-                if i < 4 and j < 4:
-                    my_val = max(my_val, self._count_box(state, i, j, self.my_piece))
-                    opp_val = max(opp_val, self._count_box(state, i, j, self.opp))
-
-        return (my_val - opp_val) / 4 # Normalize to be between -1 and 1
-
-    def _count_line(self, state, r, c, dr, dc, piece):
-        """ Helper to count pieces in a line of 4 for the heuristic. """
-        count = 0
-        for i in range(4):
-            if state[r + i*dr][c + i*dc] == piece:
-                count += 1
-            elif state[r + i*dr][c + i*dc] != ' ':
-                return 0 # Blocked by opponent
-        return count
-
-    def _count_box(self, state, r, c, piece):
-        """ Helper to count pieces in a 2x2 box for the heuristic. """
-        count = 0
-        for i in range(2):
-            for j in range(2):
-                if state[r+i][c+j] == piece:
-                    count += 1
-                elif state[r+i][c+j] != ' ':
-                    return 0 # Blocked by opponent
-        return count
-
-
-    def _minimax(self, state, depth, is_maximizing_player):
+        return _heuristic(*self._to_bitboards(state))
+
+    def _to_bitboards(self, state):
+        """ Converts a list-of-lists state into a (my_bits, opp_bits) pair of bitboards.
+
+        This is the translation layer between the string cells used for input and output and the
+        integers used by the search. The board is flattened into 25 bytes in a single pass, so
+        each cell is then an int compare rather than a string compare.
         """
-        Recursive minimax function.
-        Returns a tuple of (heuristic_score, best_move)
+        cells = ''.join(map(''.join, state)).encode()
+        my_code = ord(self.my_piece)
+        opp_code = ord(self.opp)
+        my_bits = opp_bits = 0
+        for sq, cell in enumerate(cells):
+            if cell == my_code:
+                my_bits |= 1 << sq
+            elif cell == opp_code:
+                opp_bits |= 1 << sq
+        return my_bits, opp_bits
+
+
+    def _minimax(self, my_bits, opp_bits, depth, is_maximizing_player, num_pieces, alpha=float('-inf'), beta=float('inf'), max_depth=None, state_hash=None):
+        """
+        Recursive minimax function with alpha-beta pruning and a transposition table.
+        The state is given as bitboards for this player's and the opponent's pieces, with
+        num_pieces pieces on the board, and the search stops at max_depth (self.AI_SEARCH_DEPTH
+        if not given).
+        Returns a tuple of (heuristic_score, best_move), with best_move encoded as an int (see _decode_move)
+
+        Raises:
+            _SearchTimeout: if self.deadline passes during the search.
         """
+        if max_depth is None:
+            max_depth = self.AI_SEARCH_DEPTH
+        if state_hash is None:
+            state_hash = self._hash_bits(my_bits, opp_bits)
+            if not is_maximizing_player:
+                state_hash ^= self.zobrist_side # Minimizing nodes carry the side-to-move key
+
         # Check for terminal state or max depth
-        game_val = self.game_value(state)
+        game_val = self._game_value_bits(my_bits, opp_bits, num_pieces)
         if game_val != 0:
-            return game_val, None
-        if depth == self.AI_SEARCH_DEPTH:
-            return self.heuristic_game_value(state, self.my_piece), None
+            return game_val * (1 - depth * PLY_PENALTY), None
+        remaining = max_depth - depth
+        if remaining == 0:
+            return _heuristic(my_bits, opp_bits), None
+        if time.time() > self.deadline:
+            raise _SearchTimeout
+
+        # Probe the transposition table. The root is always searched so a move is returned.
+        # Away from the leaves, positions are keyed by their canonical hash so that all symmetric
+        # positions share an entry; moves in those entries are stored in the canonical orientation.
+        drop_phase = num_pieces < 8
+        if remaining >= 2:
+            tt_hash, sym = self._canonical_hash(my_bits, opp_bits, is_maximizing_player)
+        else:
+            tt_hash, sym = state_hash, 0
+        slot = tt_hash & (self.TT_SIZE - 1)
+        entry = self.tt.get(slot)
+        tt_move = None
+        if entry is not None and entry[0] == tt_hash:
+            _, entry_depth, entry_score, entry_flag, tt_move = entry
+            entry_score = _score_from_tt(entry_score, depth)
+            tt_move = _map_move(tt_move, INVERSE_SYMMETRIES[sym], drop_phase)
+            if depth > 0 and entry_depth >= remaining:
+                if entry_flag == EXACT:
+                    return entry_score, tt_move
+                elif entry_flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score, tt_move
+        alpha_orig, beta_orig = alpha, beta
+
+        # Generate successor moves, each with the mask that toggles the mover's bitboard into the successor
+        succ_pieces = num_pieces + 1 if drop_phase else num_pieces
+        if is_maximizing_player:
+            successors = self._generate_successors(my_bits, opp_bits, 1, drop_phase, state_hash)
+        else:
+            successors = self._generate_successors(opp_bits, my_bits, 2, drop_phase, state_hash)
 
-        # Generate successors
-        successors = self._generate_successors(state, self.my_piece if is_maximizing_player else self.opp)
+        if remaining == 1:
+            # The successors are leaves: score each one directly instead of ordering and recursing into them
+            best_eval, best_move = self._evaluate_leaves(my_bits, opp_bits, depth + 1, succ_pieces, successors, is_maximizing_player, alpha, beta)
+            self._store_tt(slot, tt_hash, depth, remaining, best_eval, alpha_orig, beta_orig, _map_move(best_move, SYMMETRIES[sym], drop_phase))
+            return best_eval, best_move
+
+        self._order_successors(my_bits, opp_bits, succ_pieces, successors, depth, is_maximizing_player, tt_move)
 
         if is_maximizing_player:
             max_eval = float('-inf')
             best_move = None
-            for succ_state, move in successors:
-                evaluation, _ = self._minimax(succ_state, depth + 1, False)
+            for move, mask, succ_hash in successors:
+                evaluation, _ = self._minimax(my_bits ^ mask, opp_bits, depth + 1, False, succ_pieces, alpha, beta, max_depth, succ_hash)
                 if evaluation > max_eval:
                     max_eval = evaluation
                     best_move = move
+                alpha = max(alpha, max_eval)
+                if alpha >= beta:
+                    self.killer_moves[depth] = move
+                    break # Beta cutoff: the minimizing player will avoid this branch
+            self._store_tt(slot, tt_hash, depth, remaining, max_eval, alpha_orig, beta_orig, _map_move(best_move, SYMMETRIES[sym], drop_phase))
             return max_eval, best_move
         else: # Minimizing player
             min_eval = float('inf')
             best_move = None
-            for succ_state, move in successors:
-                evaluation, _ = self._minimax(succ_state, depth + 1, True)
+            for move, mask, succ_hash in successors:
+                evaluation, _ = self._minimax(my_bits, opp_bits ^ mask, depth + 1, True, succ_pieces, alpha, beta, max_depth, succ_hash)
                 if evaluation < min_eval:
                     min_eval = evaluation
                     best_move = move
+                beta = min(beta, min_eval)
+                if beta <= alpha:
+                    self.killer_moves[depth] = move
+                    break # Alpha cutoff: the maximizing player will avoid this branch
+            self._store_tt(slot, tt_hash, depth, remaining, min_eval, alpha_orig, beta_orig, _map_move(best_move, SYMMETRIES[sym], drop_phase))
             return min_eval, best_move
 
+    def _evaluate_leaves(self, my_bits, opp_bits, succ_depth, succ_pieces, successors, is_maximizing_player, alpha, beta):
+        """ Minimax with alpha-beta pruning over successors that are all leaves of the search.
+        Each successor is scored with game_value (adjusted for succ_depth like in _minimax), or
+        the heuristic if it is not terminal.
+        Returns a tuple of (heuristic_score, best_move)
+        """
+        best_eval = float('-inf') if is_maximizing_player else float('inf')
+        best_move = None
+        for move, mask, _ in successors:
+            if is_maximizing_player:
+                succ_my, succ_opp = my_bits ^ mask, opp_bits
+            else:
+                succ_my, succ_opp = my_bits, opp_bits ^ mask
+            game_val = self._game_value_bits(succ_my, succ_opp, succ_pieces)
+            if game_val != 0:
+                evaluation = game_val * (1 - succ_depth * PLY_PENALTY)
+            else:
+                evaluation = _heuristic(succ_my, succ_opp)
+
+            if is_maximizing_player:
+                if evaluation > best_eval:
+                    best_eval = evaluation
+                    best_move = move
+                    if best_eval >= beta:
+                        break # Beta cutoff
+            elif evaluation < best_eval:
+                best_eval = evaluation
+                best_move = move
+                if best_eval <= alpha:
+                    break # Alpha cutoff
+        return best_eval, best_move
+
+    def _store_tt(self, slot, state_hash, depth, remaining, score, alpha, beta, best_move):
+        """ Records a search result in the transposition table, flagged by how it relates to the
+        original alpha-beta window. Always replaces whatever occupied the slot.
+        """
+        if score <= alpha:
+            flag = UPPER
+        elif score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt[slot] = (state_hash, remaining, _score_to_tt(score, depth), flag, best_move)
+
+    def _hash_bits(self, my_bits, opp_bits):
+        """ Computes the Zobrist hash of a bitboard state from scratch, without the side-to-move key. """
+        h = 0
+        for sq in range(25):
+            if my_bits >> sq & 1:
+                h ^= self.zobrist[sq][1]
+            elif opp_bits >> sq & 1:
+                h ^= self.zobrist[sq][2]
+        return h
+
+    def _canonical_hash(self, my_bits, opp_bits, is_maximizing_player):
+        """ Computes the smallest Zobrist hash of a state over the 8 board symmetries.
+
+        Returns:
+            tuple: (hash, index into SYMMETRIES of the symmetry that produced it)
+        """
+        hashes = [0] * 8
+        for bits, piece_id in ((my_bits, 1), (opp_bits, 2)):
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                keys = self.sym_zobrist[bit.bit_length() - 1][piece_id]
+                hashes = [h ^ k for h, k in zip(hashes, keys)]
+        h = min(hashes)
+        sym = hashes.index(h)
+        if not is_maximizing_player:
+            h ^= self.zobrist_side
+        return h, sym
+
+    def _order_successors(self, my_bits, opp_bits, succ_pieces, successors, depth, is_maximizing_player, tt_move=None):
+        """ Sorts successors in place so the most promising moves are searched first.
+
+        Immediate wins go to the front, then moves are ranked by the heuristic value of the
+        resulting state. The best move from the transposition table, then the killer move for
+        this depth, are tried before all others.
+        """
+        def order_score(succ):
+            if is_maximizing_player:
+                succ_my, succ_opp = my_bits ^ succ[1], opp_bits
+            else:
+                succ_my, succ_opp = my_bits, opp_bits ^ succ[1]
+            game_val = self._game_value_bits(succ_my, succ_opp, succ_pieces)
+            if game_val != 0:
+                return game_val, 0
+            return 0, _heuristic(succ_my, succ_opp)
+
+        successors.sort(key=order_score, reverse=is_maximizing_player)
+
+        for preferred in (self.killer_moves.get(depth), tt_move):
+            if preferred is not None:
+                for i, succ in enumerate(successors):
+                    if succ[0] == preferred:
+                        successors.insert(0, successors.pop(i))
+                        break
+
+    def _parallel_root_search(self, my_bits, opp_bits, num_pieces, max_depth, pv_move=None):
+        """ Searches the root moves in worker processes, splitting the tree at the root.
+
+        The first move, which is pv_move if it was the best move of the previous iteration, is
+        searched here to establish alpha. The remaining moves are then searched concurrently
+        against that bound, so they keep their alpha-beta cutoffs.
+        Returns a tuple of (heuristic_score, best_move) like _minimax.
+
+        Raises:
+            _SearchTimeout: if self.deadline passes during the search.
+        """
+        drop_phase = num_pieces < 8
+        succ_pieces = num_pieces + 1 if drop_phase else num_pieces
+        successors = self._generate_successors(my_bits, opp_bits, 1, drop_phase, self._hash_bits(my_bits, opp_bits))
+        if not successors:
+            return float('-inf'), None
+        self._order_successors(my_bits, opp_bits, succ_pieces, successors, 0, True, pv_move)
+
+        best_move, first_mask, first_hash = successors[0]
+        best_score, _ = self._minimax(my_bits ^ first_mask, opp_bits, 1, False, succ_pieces, float('-inf'), float('inf'), max_depth, first_hash)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.AI_PARALLEL_WORKERS, initializer=_init_worker)
+        futures = [(move, self._executor.submit(_evaluate_subtree, my_bits ^ mask, opp_bits, succ_pieces,
+                                                best_score, max_depth, self.deadline))
+                   for move, mask, _ in successors[1:]]
+        try:
+            for move, future in futures:
+                score = future.result()
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+        finally:
+            for _, future in futures:
+                future.cancel()
+        return best_score, best_move
+
+    def close(self):
+        """ Shuts down the worker processes of the parallel root search, if any were started. """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
     def make_move(self, state):
         """ Selects a (row, col) space for the next move.
 
+        Uses iterative deepening: searches to depth 1, 2, 3, ... until self.AI_SEARCH_DEPTH is
+        reached or self.AI_TIME_LIMIT runs out, keeping the move from the deepest completed search.
+        Each iteration stores its best moves in the transposition table, so the next one searches
+        them first.
+
         Args:
             state (list of lists): current state of the game.
 
         Return:
             move (list): a list of move tuples, e.g. [(row, col)] or [(row, col), (source_row, source_col)]
         """
-        # Ensure we don't modify the original state
-        state_copy = copy.deepcopy(state)
-        
-        _, best_move = self._minimax(state_copy, 0, True)
+        # The search runs on bitboards, so the original state is never modified
+        self.killer_moves = {}
+        _heuristic.cache_clear() # Bound memory between turns
+        my_bits, opp_bits = self._to_bitboards(state)
+        num_pieces = (my_bits | opp_bits).bit_count()
+        drop_phase = num_pieces < 8
+        start_time = time.time()
+        self.deadline = start_time + self.AI_TIME_LIMIT
+
+        best_move = None
+        try:
+            for max_depth in range(1, self.AI_SEARCH_DEPTH + 1):
+                if self.AI_PARALLEL_WORKERS > 1 and num_pieces >= 2 and max_depth >= self.AI_PARALLEL_MIN_DEPTH:
+                    score, move = self._parallel_root_search(my_bits, opp_bits, num_pieces, max_depth, best_move)
+                else:
+                    score, move = self._minimax(my_bits, opp_bits, 0, True, num_pieces, float('-inf'), float('inf'), max_depth)
+                best_move = move
+                if abs(score) > DECIDED_SCORE or time.time() - start_time > self.AI_TIME_LIMIT:
+                    break # The game outcome is already decided, or there is no time for a deeper search
+        except _SearchTimeout:
+            pass # Keep the move from the deepest completed search
+        finally:
+            self.deadline = float('inf')
         
         # If minimax fails to find a move (should not happen in a valid game state), pick a random one.
         if best_move is None:
-            drop_phase = sum(row.count(self.my_piece) + row.count(self.opp) for row in state) < 8
-            successors = self._generate_successors(state, self.my_piece)
+            successors = self._generate_successors(my_bits, opp_bits, 1, drop_phase)
             if successors:
-                _, best_move = random.choice(successors)
+                best_move, _, _ = random.choice(successors)
             else: # No possible moves, should indicate a draw or loss
                 return [] 
 
-        return best_move
+        return _decode_move(best_move, drop_phase)
 
 
-    def _generate_successors(self, state, piece):
-        """Generates all possible successor states and their associated moves.
+    def _generate_successors(self, own_bits, other_bits, piece_id, drop_phase, state_hash=0):
+        """Generates all legal moves for the player owning own_bits.
 
         Args:
-            state (list of lists): the current game state.
-            piece (str): the piece to move ('b' or 'r').
+            own_bits (int): bitboard of the moving player's pieces.
+            other_bits (int): bitboard of the other player's pieces.
+            piece_id (int): 1 if the moving player is this TeekoPlayer, 2 for the opponent.
+            drop_phase (bool): whether fewer than 8 pieces are on the board.
+            state_hash (int): the Zobrist hash of the state, updated incrementally for each successor.
 
         Returns:
-            list: a list of tuples (successor_state, move)
+            list: a list of tuples (move, mask, successor_hash), where move is encoded as an int
+            (see _decode_move) and own_bits ^ mask is the moving player's bitboard after the move.
         """
         succs = []
-        num_pieces = sum(row.count(self.my_piece) + row.count(self.opp) for row in state)
-        drop_phase = num_pieces < 8
+        state_hash ^= self.zobrist_side
+        empty = ~(own_bits | other_bits) & FULL_BOARD
 
         if drop_phase:
             # Drop Phase: place a piece in any empty cell
-            for r in range(5):
-                for c in range(5):
-                    if state[r][c] == ' ':
-                        state_new = copy.deepcopy(state)
-                        state_new[r][c] = piece
-                        succs.append((state_new, [(r, c)]))
+            while empty:
+                to_bit = empty & -empty
+                empty ^= to_bit
+                to_sq = to_bit.bit_length() - 1
+                succs.append((to_sq, to_bit, state_hash ^ self.zobrist[to_sq][piece_id]))
         else:
             # Move Phase: move one of your pieces to an adjacent empty cell
-            for r in range(5):
-                for c in range(5):
-                    if state[r][c] == piece:
-                        # Check all 8 adjacent cells
-                        for dr in [-1, 0, 1]:
-                            for dc in [-1, 0, 1]:
-                                if dr == 0 and dc == 0:
-                                    continue
-                                
-                                r_new, c_new = r + dr, c + dc
-                                
-                                if 0 <= r_new < 5 and 0 <= c_new < 5 and state[r_new][c_new] == ' ':
-                                    state_new = copy.deepcopy(state)
-                                    state_new[r][c] = ' '
-                                    state_new[r_new][c_new] = piece
-                                    succs.append((state_new, [(r_new, c_new), (r, c)]))
+            pieces = own_bits
+            while pieces:
+                from_bit = pieces & -pieces
+                pieces ^= from_bit
+                from_sq = from_bit.bit_length() - 1
+                targets = ADJ_MASKS[from_sq] & empty
+                while targets:
+                    to_bit = targets & -targets
+                    targets ^= to_bit
+                    to_sq = to_bit.bit_length() - 1
+                    succ_hash = state_hash ^ self.zobrist[from_sq][piece_id] ^ self.zobrist[to_sq][piece_id]
+                    succs.append((to_sq * 25 + from_sq, from_bit | to_bit, succ_hash))
         return succs
 
+    def _apply_move(self, state, move, piece):
+        """ Applies a move to state in place. """
+        if len(move) > 1:
+            state[move[1][0]][move[1][1]] = ' '
+        state[move[0][0]][move[0][1]] = piece
+
     def opponent_move(self, move):
         """ Validates and applies the opponent's move to the internal board state.
 
@@ -211,9 +528,7 @@ class TeekoPlayer:
 
     def place_piece(self, move, piece):
         """ Modifies the board representation using the specified move and piece. """
-        if len(move) > 1:
-            self.board[move[1][0]][move[1][1]] = ' '
-        self.board[move[0][0]][move[0][1]] = piece
+        self._apply_move(self.board, move, piece)
 
     def print_board(self):
         """ Formatted printing for the board. """
@@ -235,41 +550,41 @@ class TeekoPlayer:
         Returns:
             int: 1 if this TeekoPlayer wins, -1 if the opponent wins, 0 if no winner.
         """
-        # Check horizontal
-        for row in state:
-            for i in range(2):
-                if row[i] != ' ' and row[i] == row[i+1] == row[i+2] == row[i+3]:
-                    return 1 if row[i] == self.my_piece else -1
-
-        # Check vertical
-        for col in range(5):
-            for i in range(2):
-                if state[i][col] != ' ' and state[i][col] == state[i+1][col] == state[i+2][col] == state[i+3][col]:
-                    return 1 if state[i][col] == self.my_piece else -1
-
-        # Check \ diagonal
-        for i in range(2):
-            for j in range(2):
-                if state[i][j]!=' ' and state[i][j] == state[i+1][j+1] == state[i+2][j+2] == state[i+3][j+3]:
-                    return 1 if state[i][j] == self.my_piece else -1
-
-        # Check / diagonal
-        for i in range(2):
-            for j in range(3, 5):
-                if state[i][j]!=' ' and state[i][j] == state[i+1][j-1] == state[i+2][j-2] == state[i+3][j-3]:
-                    return 1 if state[i][j] == self.my_piece else -1
-
-        # Check 2x2 box
-        for i in range(4):
-            for j in range(4):
-                if state[i][j] != ' ' and \
-                   state[i][j] == state[i+1][j] and \
-                   state[i][j] == state[i][j+1] and \
-                   state[i][j] == state[i+1][j+1]:
-                    return 1 if state[i][j] == self.my_piece else -1
-        
+        my_bits, opp_bits = self._to_bitboards(state)
+        return self._game_value_bits(my_bits, opp_bits, (my_bits | opp_bits).bit_count())
+
+    def _game_value_bits(self, my_bits, opp_bits, num_pieces):
+        """ Bitboard version of game_value. A player needs 4 pieces on the board to have won,
+        so the formations are only scanned for players that have them.
+        """
+        if num_pieces < 4:
+            return 0
+        if my_bits.bit_count() >= 4:
+            for m in WIN_MASKS:
+                if my_bits & m == m:
+                    return 1
+        if opp_bits.bit_count() >= 4:
+            for m in WIN_MASKS:
+                if opp_bits & m == m:
+                    return -1
         return 0 # No winner
 
+_worker_player = None # The TeekoPlayer that searches subtrees in a worker process
+
+def _init_worker():
+    """ Initializes a worker process of the parallel root search. """
+    global _worker_player
+    _worker_player = TeekoPlayer()
+
+def _evaluate_subtree(my_bits, opp_bits, num_pieces, alpha, max_depth, deadline):
+    """ Searches the subtree below one root move in a worker process and returns its score.
+    Scores at or below alpha are upper bounds only, which is enough to reject the move.
+    The worker has its own Zobrist keys, so _minimax hashes the subtree's root itself.
+    """
+    _worker_player.deadline = deadline
+    score, _ = _worker_player._minimax(my_bits, opp_bits, 1, False, num_pieces, alpha, float('inf'), max_depth)
+    return score
+
 def print_instructions():
     """Prints the game instructions."""
     print("""
@@ -363,7 +678,8 @@ def main():
     turn = 0 # 0 for 'b', 1 for 'r'
 
     # Main game loop
-    while ai.game_value(ai.board) == 0:
+    result = ai.game_value(ai.board)
+    while result == 0:
         is_drop_phase = piece_count < 8
         current_player_piece = ai.pieces[turn]
         
@@ -404,15 +720,17 @@ def main():
             piece_count += 1
             
         turn = 1 - turn # Switch turns
+        result = ai.game_value(ai.board)
 
     # Game over
     ai.print_board()
-    if ai.game_value(ai.board) == 1:
+    if result == 1:
         print("\nAI wins! Game over.")
-    elif ai.game_value(ai.board) == -1:
+    elif result == -1:
         print("\nCongratulations, you win! Game over.")
     else:
         print("\nIt's a draw! Game over.")
+    ai.close()
 
 if __name__ == "__main__":
     main()